@@ -1,10 +1,14 @@
 """Source localization algorithms - using autocleaneeg-eeg2source package.
 
-This module maintains backward compatibility by providing the same function signatures,
-but all processing is now delegated to the autocleaneeg-eeg2source PyPI package.
+This module reproduces the autocleaneeg-eeg2source ``SequentialProcessor`` pipeline
+on in-memory MNE objects. The fsaverage template, forward/inverse operators and the
+fused 68-ROI inverse operator are cached per process, so sensor data is mapped to
+Desikan-Killiany regions in one matmul and no vertex-level source estimates (or
+temporary EEGLAB files) are ever created.
 
-IMPORTANT: These functions are maintained for backward compatibility only.
-New code should use the SourceLocalizationMixin.apply_source_localization() method.
+The ``estimate_source_function_*`` functions are maintained for backward
+compatibility only. New code should use the
+SourceLocalizationMixin.apply_source_localization() method.
 
 References
 ----------
@@ -14,11 +18,20 @@ minimum norm estimates. Medical & Biological Engineering & Computing, 32(1), 35-
 
 import tempfile
 import os
-from pathlib import Path
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 import mne
+from mne.datasets import fetch_fsaverage
+from mne.minimum_norm import apply_inverse_epochs, apply_inverse_raw, prepare_inverse_operator
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
 
 try:
+    import autoclean_eeg2source
     from autoclean_eeg2source.core.converter import SequentialProcessor
     from autoclean_eeg2source.core.memory_manager import MemoryManager
 except ImportError:
@@ -27,6 +40,498 @@ except ImportError:
         "  pip install autocleaneeg-eeg2source"
     )
 
+# Optional: BLAS thread control for parallel forward builds
+try:
+    from threadpoolctl import threadpool_limits
+
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# process_data() mirrors SequentialProcessor internals (_setup_fsaverage,
+# _get_forward_solution, labels, fsaverage_src) as of eeg2source 0.3.7; other
+# release series use the file-based process_file() round trip instead
+_EEG2SOURCE_SERIES = ("0", "3")
+_MIRRORS_EEG2SOURCE = (
+    tuple(getattr(autoclean_eeg2source, "__version__", "").split(".")[:2])
+    == _EEG2SOURCE_SERIES
+)
+
+# Cache budget for epoch tiles (typical L3 size)
+_TILE_BYTES = 8 * 1024 * 1024
+
+# fsaverage subject directory and (src, bem, labels), resolved once per process
+_FS_DIR = None
+_FSAVERAGE = None
+
+# (forward, inverse) operators keyed by sensor layout, shared across subjects.
+# Each entry holds ~100 MB for a high-density montage, so only the most recently
+# used layouts are kept. Builds run under the lock, optionally ahead of time on
+# the background pool, which is created by the first prefetch_operators() call
+_OPERATOR_CACHE = OrderedDict()
+_OPERATOR_CACHE_SIZE = 2
+_OPERATOR_LOCK = threading.Lock()
+_OPERATOR_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# Fused (n_labels, n_channels) ROI inverse operators keyed by sensor layout and lambda2
+_ROI_OPERATOR_CACHE = OrderedDict()
+
+# Label mean-extraction matrices, keyed by source space (fsaverage + DK is fixed)
+_LABEL_INDEX_CACHE = OrderedDict()
+_SMALL_CACHE_SIZE = 8
+
+
+def process_data(processor, data, n_jobs=1):
+    """Apply source localization to an in-memory Raw or Epochs object.
+
+    Performs the same steps as ``SequentialProcessor.process_file`` (EEG channel
+    selection, montage, resampling, average reference, MNE inverse and DK label
+    averaging) without exporting to and re-reading from EEGLAB files. A native
+    ``processor.process_data`` is used when the installed package provides one;
+    processors without the fsaverage attributes, or from an eeg2source release
+    series other than the mirrored 0.3.x, fall back to the file-based round trip.
+
+    Args:
+        processor: ``SequentialProcessor`` holding montage, resample_freq and lambda2
+        data: MNE Raw or Epochs object (not modified)
+        n_jobs: Worker processes for the one-time forward solution build. The
+            inverse itself is a single matmul threaded by BLAS.
+
+    Returns:
+        mne.io.Raw or mne.Epochs: 68-channel data with DK atlas regions as channels
+    """
+    if hasattr(processor, "process_data"):
+        return processor.process_data(data)
+    if not _MIRRORS_EEG2SOURCE or not hasattr(processor, "fsaverage_src"):
+        return _process_via_eeglab(processor, data)
+
+    inst = _prepare_sensor_data(processor, data.copy())
+
+    # Waits here if prefetch_operators() is still building this layout
+    with _OPERATOR_LOCK:
+        _setup_fsaverage(processor)
+        fwd, inv = _get_operators(processor, inst.info, n_jobs=n_jobs)
+    layout = _operator_key(processor, inst.info)
+
+    try:
+        # Private MNE helpers: imported on use so an MNE release that moves them
+        # falls back to the public apply_inverse_* functions below
+        from mne.minimum_norm.inverse import _pick_channels_inverse_operator
+
+        # Label means of the inverse kernel: ROI time courses without building sources
+        roi_operator = _roi_operator(
+            layout, inv, processor.lambda2, fwd["src"], processor.labels
+        )
+    except ImportError:
+        return _run_apply_inverse(inst, inv, processor.lambda2, fwd["src"], processor.labels)
+    sel = _pick_channels_inverse_operator(inst.ch_names, inv)
+
+    if isinstance(inst, mne.BaseEpochs):
+        return _run_epochs(inst, roi_operator, sel, processor.labels)
+    return _run_raw(inst, roi_operator, sel, processor.labels)
+
+
+def prefetch_operators(processor, info, n_jobs=1):
+    """Build the forward/inverse operators for ``info`` in a background thread.
+
+    Lets the one-time forward solution overlap with preprocessing; a later
+    :func:`process_data` call for the same layout waits for it and reuses the
+    cached operators. The layout ignores the sampling rate, so resampling in
+    between still hits the cache. Only ``info`` is needed, so no sensor data is
+    copied. Nothing is built when :func:`process_data` would not use the cache
+    (a native ``processor.process_data`` or an unmirrored eeg2source release).
+
+    Args:
+        processor: ``SequentialProcessor`` configured as for :func:`process_data`
+        info: Info of the data that will be localized
+        n_jobs: Worker processes for the forward solution build
+
+    Returns:
+        concurrent.futures.Future or None: Resolves to ``(forward, inverse)``;
+        None when nothing is prefetched
+    """
+    if hasattr(processor, "process_data") or not _MIRRORS_EEG2SOURCE:
+        return None
+
+    template = mne.io.RawArray(
+        np.zeros((len(info["ch_names"]), max(1, int(info["sfreq"])))),
+        info.copy(), verbose=False
+    )
+
+    def build():
+        inst = _prepare_sensor_data(processor, template)
+        with _OPERATOR_LOCK:
+            _setup_fsaverage(processor)
+            return _get_operators(processor, inst.info, n_jobs=n_jobs)
+
+    global _OPERATOR_POOL
+    with _POOL_LOCK:
+        if _OPERATOR_POOL is None:
+            _OPERATOR_POOL = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="source-operators"
+            )
+    return _OPERATOR_POOL.submit(build)
+
+
+def _prepare_sensor_data(processor, inst):
+    """Apply the package's sensor preprocessing to ``inst`` in place."""
+    # Remove EOG channels before localization
+    eog_channels = [
+        ch for ch in inst.ch_names
+        if any(eog in ch.upper() for eog in ("EOG", "HEOG", "VEOG"))
+    ]
+    if eog_channels:
+        inst.set_channel_types({ch: "eog" for ch in eog_channels})
+    inst.pick("eeg")
+
+    # Same as process_file: the named montage always sets the sensor positions
+    inst.set_montage(
+        mne.channels.make_standard_montage(processor.montage), match_case=False
+    )
+
+    if inst.info["sfreq"] != processor.resample_freq:
+        inst.resample(processor.resample_freq)
+
+    # Chained pipeline steps may already have added the average reference projector
+    if not any(proj["desc"] == "Average EEG reference" for proj in inst.info["projs"]):
+        inst.set_eeg_reference("average", projection=True)
+
+    return inst
+
+
+def _fs_dir():
+    """Return the fsaverage directory, calling ``fetch_fsaverage`` only once.
+
+    ``fetch_fsaverage`` stats the whole fsaverage tree even when it is already
+    downloaded, which is slow on network filesystems.
+    """
+    global _FS_DIR
+    if _FS_DIR is None:
+        _FS_DIR = str(fetch_fsaverage(verbose=False))
+    return _FS_DIR
+
+
+def _setup_fsaverage(processor):
+    """Load the fsaverage source space, BEM path and DK labels onto ``processor``.
+
+    Equivalent to ``SequentialProcessor._setup_fsaverage``, but the template is
+    read once per process and shared by every processor.
+    """
+    global _FSAVERAGE
+    if processor.fsaverage_src is not None:
+        return
+
+    if _FSAVERAGE is None:
+        fs_dir = _fs_dir()
+        src = mne.read_source_spaces(
+            os.path.join(fs_dir, "bem", "fsaverage-ico-5-src.fif"), verbose=False
+        )
+        bem = os.path.join(fs_dir, "bem", "fsaverage-5120-5120-5120-bem-sol.fif")
+        labels = mne.read_labels_from_annot(
+            "fsaverage", parc="aparc", subjects_dir=os.path.dirname(fs_dir), verbose=False
+        )
+        labels = [label for label in labels if "unknown" not in label.name]
+        _FSAVERAGE = (src, bem, labels)
+
+    processor.fsaverage_src, processor.fsaverage_bem, processor.labels = _FSAVERAGE
+
+
+def _get_operators(processor, info, n_jobs=1):
+    """Return cached ``(forward, inverse)`` operators for this sensor layout.
+
+    Keyed by montage, channel names, bad channels, sensor positions and
+    projectors (none depend on the sampling rate), so subjects recorded with the same montage share one forward/inverse
+    computation. The forward model matches ``SequentialProcessor`` but is built
+    here so ``n_jobs`` reaches MNE (which honours ``MNE_FORCE_SERIAL``).
+    """
+    key = _operator_key(processor, info)
+    operators = _cache_get(_OPERATOR_CACHE, key)
+    if operators is None:
+        processor.memory_manager.check_available()
+        with _blas_thread_limits(n_jobs):
+            fwd = mne.make_forward_solution(
+                info, trans="fsaverage", src=processor.fsaverage_src,
+                bem=processor.fsaverage_bem, eeg=True, mindist=5.0,
+                n_jobs=n_jobs, verbose=False
+            )
+        noise_cov = mne.make_ad_hoc_cov(info, verbose=False)
+        inv = mne.minimum_norm.make_inverse_operator(info, fwd, noise_cov, verbose=False)
+        operators = _cache_put(_OPERATOR_CACHE, key, (fwd, inv), _OPERATOR_CACHE_SIZE)
+    processor.forward_solution = operators[0]
+    return operators
+
+
+def _operator_key(processor, info):
+    """Return the sensor layout key shared by the operator caches.
+
+    Bad channels are part of the layout: the inverse operator and the average
+    reference projector are built without them.
+    """
+    pos = np.array([ch["loc"][:3] for ch in info["chs"]])
+    return (
+        processor.montage,
+        tuple(info["ch_names"]),
+        tuple(info["bads"]),
+        tuple(proj["desc"] for proj in info["projs"]),
+        np.round(pos, 6).tobytes(),
+    )
+
+
+def _cache_get(cache, key):
+    """Return ``cache[key]`` (None when missing) and mark it most recently used."""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache, key, value, maxsize):
+    """Store ``value`` under ``key``, evicting least recently used entries past ``maxsize``."""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+    return value
+
+
+def _blas_thread_limits(n_jobs):
+    """Cap BLAS threads to physical cores / n_jobs while worker processes run.
+
+    Avoids oversubscription when ``n_jobs`` workers each start a full BLAS
+    thread pool. A no-op for serial runs or without threadpoolctl.
+    """
+    if n_jobs == 1 or not THREADPOOLCTL_AVAILABLE:
+        return nullcontext()
+
+    n_cores = None
+    if PSUTIL_AVAILABLE:
+        n_cores = psutil.cpu_count(logical=False)
+    if not n_cores:
+        n_cores = max(1, (os.cpu_count() or 2) // 2)
+    n_workers = n_cores if n_jobs < 0 else n_jobs
+    return threadpool_limits(limits=max(1, n_cores // max(1, n_workers)), user_api="blas")
+
+
+def apply_roi_inverse(sensor_data, roi_operator, out=None):
+    """Project sensor data straight to DK label time courses.
+
+    Args:
+        sensor_data: EEG data (n_channels, n_times) or (n_epochs, n_channels, n_times),
+            channels ordered as the inverse operator expects
+        roi_operator: Fused operator from :func:`_roi_operator`
+        out: Optional preallocated output buffer of the result shape; one buffer
+            is allocated for all epochs when omitted
+
+    Returns:
+        np.ndarray: Label time courses (n_labels, n_times) or (n_epochs, n_labels, n_times)
+    """
+    if out is None:
+        shape = sensor_data.shape[:-2] + (roi_operator.shape[0], sensor_data.shape[-1])
+        out = np.empty(shape, dtype=np.result_type(roi_operator, sensor_data))
+    return np.matmul(roi_operator, sensor_data, out=out)
+
+
+def _roi_operator(layout, inv, lambda2, src, labels):
+    """Return the fused ``(n_labels, n_channels)`` operator ``W_roi = A_roi @ K``.
+
+    ``K`` is the normal-orientation MNE kernel that ``apply_inverse_raw`` and
+    ``apply_inverse_epochs`` build internally (whitener and projectors included)
+    and ``A_roi`` the label mean-extraction matrix, so ``W_roi @ Y`` equals
+    ``extract_label_time_course(apply_inverse(Y), mode="mean")`` without ever
+    materialising the (n_sources, n_times) estimate. Cached per sensor layout (the
+    :func:`_operator_key` of ``inv``) and lambda2.
+    Raises ImportError if MNE no longer provides ``_assemble_kernel``.
+    """
+    from mne.minimum_norm.inverse import _assemble_kernel
+
+    key = (layout, lambda2)
+    cached = _cache_get(_ROI_OPERATOR_CACHE, key)
+    if cached is not None:
+        return cached
+
+    inv_prepared = prepare_inverse_operator(inv, nave=1, lambda2=lambda2, method="MNE", verbose=False)
+    kernel = _assemble_kernel(inv_prepared, None, "MNE", "normal")[0]
+    roi_operator = np.ascontiguousarray(_label_averaging_matrix(src, labels) @ kernel)
+    return _cache_put(_ROI_OPERATOR_CACHE, key, roi_operator, _SMALL_CACHE_SIZE)
+
+
+def _label_averaging_matrix(src, labels):
+    """Build the sparse (n_labels, n_vertices) mean-extraction matrix for ``src``.
+
+    Row ``i`` holds ``1 / n`` at the ``n`` vertices of label ``i``, so ``A @ stc.data``
+    equals ``extract_label_time_course(mode="mean")``. Each vertex belongs to at
+    most one DK label, so CSR storage costs O(n_vertices) instead of
+    O(n_labels * n_vertices). Uses the forward solution's source space, since
+    ``mindist`` may drop vertices from the template source space. Cached per
+    source space.
+    """
+    key = (id(src), tuple(label.name for label in labels))
+    cached = _cache_get(_LABEL_INDEX_CACHE, key)
+    if cached is not None and cached[0] is src:
+        return cached[1]
+
+    vertno = [s["vertno"] for s in src]
+    offsets = {"lh": 0, "rh": len(vertno[0])}
+    hemi_vertno = {"lh": vertno[0], "rh": vertno[1]}
+    rows, cols, weights = [], [], []
+    for i, label in enumerate(labels):
+        hemi_vertices = hemi_vertno[label.hemi]
+        used = np.intersect1d(hemi_vertices, label.vertices)
+        rows.append(np.full(used.size, i))
+        cols.append(np.searchsorted(hemi_vertices, used) + offsets[label.hemi])
+        weights.append(np.full(used.size, 1.0 / max(used.size, 1)))
+
+    averaging = csr_matrix(
+        (np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(labels), sum(len(v) for v in vertno)),
+    )
+    _cache_put(_LABEL_INDEX_CACHE, key, (src, averaging), _SMALL_CACHE_SIZE)
+    return averaging
+
+
+def _run_raw(raw, roi_operator, sel, labels):
+    """Localize continuous data to a 68-channel RawArray."""
+    label_data = apply_roi_inverse(raw.get_data(picks=sel), roi_operator)
+    info = _roi_info(labels, raw.info["sfreq"])
+    return mne.io.RawArray(label_data, info, first_samp=0, verbose=False)
+
+
+def _run_epochs(epochs, roi_operator, sel, labels):
+    """Localize epoched data to a 68-channel EpochsArray, keeping event codes."""
+    # Stream the epochs through the operator in cache-sized tiles: only one tile
+    # of sensor data is gathered (channel selection copies) at a time
+    sensor_data = epochs.get_data(copy=False)
+    n_epochs, _, n_times = sensor_data.shape
+    tile = max(1, (_TILE_BYTES // 2) // (len(sel) * n_times * sensor_data.itemsize))
+    label_data = np.empty(
+        (n_epochs, roi_operator.shape[0], n_times),
+        dtype=np.result_type(roi_operator, sensor_data)
+    )
+    for start in range(0, n_epochs, tile):
+        stop = min(start + tile, n_epochs)
+        apply_roi_inverse(
+            sensor_data[start:stop, sel], roi_operator, out=label_data[start:stop]
+        )
+
+    return _roi_epochs(epochs, label_data, labels)
+
+
+def _run_apply_inverse(inst, inv, lambda2, src, labels):
+    """Localize through the public ``apply_inverse_*`` functions.
+
+    Slower fallback for :func:`process_data` when MNE's private kernel helpers
+    are unavailable: builds vertex-level estimates (one epoch at a time) and
+    averages them per label, as ``SequentialProcessor`` does.
+    """
+    averaging = _label_averaging_matrix(src, labels)
+    if isinstance(inst, mne.BaseEpochs):
+        stcs = apply_inverse_epochs(
+            inst, inv, lambda2, "MNE", pick_ori="normal",
+            return_generator=True, verbose=False
+        )
+        label_data = np.empty((len(inst), len(labels), len(inst.times)))
+        for i, stc in enumerate(stcs):
+            label_data[i] = averaging @ stc.data
+        return _roi_epochs(inst, label_data, labels)
+
+    stc = apply_inverse_raw(inst, inv, lambda2, "MNE", pick_ori="normal", verbose=False)
+    info = _roi_info(labels, inst.info["sfreq"])
+    return mne.io.RawArray(averaging @ stc.data, info, first_samp=0, verbose=False)
+
+
+def _roi_epochs(epochs, label_data, labels):
+    """Wrap label time courses in an EpochsArray, keeping event codes."""
+    n_epochs = len(label_data)
+    sfreq = epochs.info["sfreq"]
+    info = _roi_info(labels, sfreq)
+
+    # Space events apart (100 ms padding) so the EEGLAB exporter does not
+    # insert boundary events between epochs, matching the package output
+    epoch_duration = epochs.times[-1] - epochs.times[0]
+    epoch_spacing = int(sfreq * epoch_duration) + int(sfreq * 0.1)
+    events = np.zeros((n_epochs, 3), dtype=int)
+    events[:, 0] = np.arange(n_epochs) * epoch_spacing
+    events[:, 2] = epochs.events[:, 2]
+
+    return mne.EpochsArray(
+        label_data, info, events=events, event_id=epochs.event_id,
+        tmin=epochs.tmin, verbose=False
+    )
+
+
+def _roi_info(labels, sfreq):
+    """Create Info with one EEG channel per label, placed at the label centroid."""
+    ch_names = [label.name for label in labels]
+    info = mne.create_info(ch_names=ch_names, sfreq=sfreq, ch_types="eeg")
+    for idx, label in enumerate(labels):
+        if len(label.pos) > 0:
+            info["chs"][idx]["loc"][:3] = label.pos.mean(axis=0)
+    return info
+
+
+def save_region_info(source_data, file_path):
+    """Save ROI names, hemispheres and centroid positions to CSV.
+
+    Args:
+        source_data: 68-channel Raw or Epochs returned by :func:`process_data`
+        file_path: Destination CSV path
+    """
+    ch_names = source_data.ch_names
+    pos = np.array([ch["loc"][:3] for ch in source_data.info["chs"]])
+    region_info = {
+        "names": ch_names,
+        "hemisphere": np.fromiter(
+            ("lh" if name.endswith("-lh") else "rh" for name in ch_names),
+            dtype="U2", count=len(ch_names)
+        ),
+        "x": pos[:, 0],
+        "y": pos[:, 1],
+        "z": pos[:, 2],
+    }
+    pd.DataFrame(region_info).to_csv(file_path, index=False)
+
+
+def _process_via_eeglab(processor, data):
+    """Fallback: export to a temporary EEGLAB file and run ``process_file``."""
+    is_raw = isinstance(data, mne.io.BaseRaw)
+
+    # EEGLAB files do not carry info["bads"]; drop those channels so they stay
+    # out of the reference and inverse, as in the in-memory path
+    if data.info["bads"]:
+        data = data.copy().drop_channels(data.info["bads"])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp_input = os.path.join(tmpdir, "temp_input.set")
+        data.export(tmp_input, fmt='eeglab', overwrite=True)
+
+        result = processor.process_file(tmp_input, tmpdir)
+
+        if result['status'] != 'success':
+            raise RuntimeError(f"Processing failed: {result.get('error')}")
+
+        if is_raw:
+            return mne.io.read_raw_eeglab(result['output_file'], preload=True)
+        return mne.read_epochs_eeglab(result['output_file'])
+
+
+def _make_processor(info, config):
+    """Create a processor from a legacy config dictionary."""
+    config = config or {}
+    return SequentialProcessor(
+        memory_manager=MemoryManager(),
+        montage=config.get("montage", "GSN-HydroCel-129"),
+        resample_freq=info['sfreq'],
+        lambda2=config.get("lambda2", 1.0/9.0)
+    )
+
 
 def estimate_source_function_raw(raw: mne.io.Raw, config: dict = None, save_stc: bool = False):
     """
@@ -46,28 +551,7 @@ def estimate_source_function_raw(raw: mne.io.Raw, config: dict = None, save_stc:
     print("WARNING: Using autocleaneeg-eeg2source package for source localization")
     print("Output is 68-channel DK region data, not raw source estimates")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Export to temp file
-        tmp_input = os.path.join(tmpdir, "temp_raw.set")
-        raw.export(tmp_input, fmt='eeglab', overwrite=True)
-
-        # Process with package
-        processor = SequentialProcessor(
-            memory_manager=MemoryManager(),
-            montage=config.get("montage", "GSN-HydroCel-129") if config else "GSN-HydroCel-129",
-            resample_freq=raw.info['sfreq'],
-            lambda2=config.get("lambda2", 1.0/9.0) if config else 1.0/9.0
-        )
-
-        result = processor.process_file(tmp_input, tmpdir)
-
-        if result['status'] != 'success':
-            raise RuntimeError(f"Processing failed: {result.get('error')}")
-
-        # Load 68-region output
-        output_raw = mne.io.read_raw_eeglab(result['output_file'], preload=True)
-
-    return output_raw
+    return process_data(_make_processor(raw.info, config), raw)
 
 
 def estimate_source_function_epochs(epochs: mne.Epochs, config: dict = None):
@@ -87,28 +571,7 @@ def estimate_source_function_epochs(epochs: mne.Epochs, config: dict = None):
     print("WARNING: Using autocleaneeg-eeg2source package for source localization")
     print("Output is 68-channel DK region data, not raw source estimates")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Export to temp file
-        tmp_input = os.path.join(tmpdir, "temp_epochs.set")
-        epochs.export(tmp_input, fmt='eeglab', overwrite=True)
-
-        # Process with package
-        processor = SequentialProcessor(
-            memory_manager=MemoryManager(),
-            montage=config.get("montage", "GSN-HydroCel-129") if config else "GSN-HydroCel-129",
-            resample_freq=epochs.info['sfreq'],
-            lambda2=config.get("lambda2", 1.0/9.0) if config else 1.0/9.0
-        )
-
-        result = processor.process_file(tmp_input, tmpdir)
-
-        if result['status'] != 'success':
-            raise RuntimeError(f"Processing failed: {result.get('error')}")
-
-        # Load 68-region output
-        output_epochs = mne.read_epochs_eeglab(result['output_file'])
-
-    return output_epochs
+    return process_data(_make_processor(epochs.info, config), epochs)
 
 
 def convert_stc_to_eeg(*args, **kwargs):
@@ -7,26 +7,14 @@ ensuring consistent results and easier maintenance.
 The mixin always outputs 68-channel EEG data (Desikan-Killiany atlas regions).
 """
 
+import os
 from pathlib import Path
 from typing import Optional, Union
-import tempfile
-import shutil
-import os
 
 import warnings
 
 import mne
 
-# Import from PyPI package
-try:
-    from autoclean_eeg2source.core.converter import SequentialProcessor
-    from autoclean_eeg2source.core.memory_manager import MemoryManager
-except ImportError:
-    raise ImportError(
-        "autocleaneeg-eeg2source package not found. Install with:\n"
-        "  pip install autocleaneeg-eeg2source"
-    )
-
 
 class SourceLocalizationMixin:
     """Mixin class for EEG source localization using autocleaneeg-eeg2source.
@@ -55,6 +43,7 @@ class SourceLocalizationMixin:
         montage: Optional[str] = None,
         resample_freq: Optional[float] = None,
         max_memory_gb: float = 8.0,
+        n_jobs: int = 1,
         stage_name: str = "apply_source_localization",
     ) -> Union[mne.io.Raw, mne.Epochs]:
         """Apply MNE source localization and convert to 68 DK atlas regions.
@@ -74,6 +63,8 @@ class SourceLocalizationMixin:
             montage: EEG montage name (default: None, auto-detect from data)
             resample_freq: Target sampling frequency (default: keep original)
             max_memory_gb: Maximum memory usage in GB (default: 8.0)
+            n_jobs: Worker processes for the one-time forward solution build
+                (default: 1). Applying the inverse is a single BLAS-threaded matmul.
             stage_name: Name for saving and metadata tracking
 
         Returns:
@@ -106,17 +97,19 @@ class SourceLocalizationMixin:
             - Preserves event structure for epoched data
             - Outputs saved to derivatives/source_localization/
         """
+        # Resolve task hooks once; plain-Python callers fall back to print
+        message = getattr(self, "message", None) or _print_message
+        update_metadata = getattr(self, "_update_metadata", None)
+        check_step_enabled = getattr(self, "_check_step_enabled", None)
+        config = getattr(self, "config", None) or {}
+        file_path = getattr(self, "file_path", None)
+
         # Check if this step is enabled in configuration
-        if hasattr(self, "_check_step_enabled"):
-            is_enabled, config_value = self._check_step_enabled(
-                "apply_source_localization"
-            )
+        if check_step_enabled is not None:
+            is_enabled, config_value = check_step_enabled("apply_source_localization")
 
             if not is_enabled:
-                if hasattr(self, "message"):
-                    self.message("info", "Source localization step is disabled")
-                else:
-                    print("INFO: Source localization step is disabled")
+                message("info", "Source localization step is disabled")
                 return None
 
             # Get parameters from config if available
@@ -126,15 +119,23 @@ class SourceLocalizationMixin:
                 montage = config_value.get("montage", montage)
                 resample_freq = config_value.get("resample_freq", resample_freq)
                 max_memory_gb = config_value.get("max_memory_gb", max_memory_gb)
+                n_jobs = config_value.get("n_jobs", n_jobs)
+
+        # Deferred so disabled runs never import autocleaneeg-eeg2source; raises
+        # ImportError with install instructions if the package is missing
+        from .algorithm import (
+            MemoryManager,
+            SequentialProcessor,
+            process_data,
+            save_region_info,
+        )
 
         # Determine which data to use
         if data is None:
-            # Try to get data from task object
-            if hasattr(self, "epochs") and self.epochs is not None:
-                data = self.epochs
-            elif hasattr(self, "raw") and self.raw is not None:
-                data = self.raw
-            else:
+            data = getattr(self, "epochs", None)
+            if data is None:
+                data = getattr(self, "raw", None)
+            if data is None:
                 raise AttributeError(
                     "No input data found. Provide data parameter or ensure "
                     "self.raw or self.epochs exists."
@@ -142,172 +143,115 @@ class SourceLocalizationMixin:
 
         # Type checking
         is_raw = isinstance(data, mne.io.BaseRaw)
-        is_epochs = isinstance(data, mne.BaseEpochs)
-
-        if not (is_raw or is_epochs):
+        if not (is_raw or isinstance(data, mne.BaseEpochs)):
             raise TypeError(
                 f"Data must be mne.io.Raw or mne.Epochs, got {type(data)}"
             )
+        data_type = "raw" if is_raw else "epochs"
 
         # Auto-detect montage from data if not specified
         if montage is None:
-            # Check if data has montage set
-            if data.get_montage() is not None:
-                detected_montage = data.get_montage()
-                # Get montage name if available, otherwise use 'unknown'
-                montage_name = getattr(detected_montage, 'kind', 'unknown')
-                if hasattr(self, "message"):
-                    self.message("info", f"Auto-detected montage from data: {montage_name}")
-                # Note: SequentialProcessor requires montage, but data already has positions
-                # We'll pass the detected name, but positions come from exported .set file
+            montage_name = _detect_montage_name(data)
+            if montage_name is not None:
+                message("info", f"Auto-detected montage from data: {montage_name}")
+                # The named montage is applied to the data before the forward model is built
                 montage = montage_name if montage_name != 'unknown' else "standard_1020"
             else:
                 # No montage on data, use default
                 montage = "standard_1020"
-                if hasattr(self, "message"):
-                    self.message("warning", "No montage detected, using default: standard_1020")
+                message("warning", "No montage detected, using default: standard_1020")
 
         try:
-            # Log start
-            if hasattr(self, "message"):
-                self.message("header", "Applying source localization")
-                self.message("info", f"Using autocleaneeg-eeg2source package")
-                self.message("info", f"Method: {method}, lambda2: {lambda2}")
-                self.message(
-                    "info",
-                    f"Input: {'Raw' if is_raw else 'Epochs'}, montage: {montage}",
-                )
-            else:
-                print("=== Applying Source Localization ===")
-                print(f"Using autocleaneeg-eeg2source package")
-                print(f"Method: {method}, lambda2: {lambda2}")
-
-            # Create temporary directory for processing
-            with tempfile.TemporaryDirectory() as tmpdir:
-                # Export data to temporary EEGLAB file
-                tmp_input = os.path.join(tmpdir, "temp_input.set")
-
-                if hasattr(self, "message"):
-                    self.message("info", "Exporting to temporary file for processing...")
+            message("header", "Applying source localization")
+            message("info", "Using autocleaneeg-eeg2source package")
+            message("info", f"Method: {method}, lambda2: {lambda2}")
+            message("info", f"Input: {data_type.capitalize()}, montage: {montage}")
+
+            # Initialize processor from package
+            memory_manager = MemoryManager(max_memory_gb=max_memory_gb)
+
+            processor = SequentialProcessor(
+                memory_manager=memory_manager,
+                montage=montage,
+                resample_freq=resample_freq or data.info['sfreq'],
+                lambda2=lambda2
+            )
 
-                data.export(tmp_input, fmt='eeglab', overwrite=True)
+            message("info", "Processing with source localization...")
 
-                # Initialize processor from package
-                memory_manager = MemoryManager(max_memory_gb=max_memory_gb)
+            # Localize in memory - no temporary EEGLAB export/re-read:
+            # 1. Applies source localization
+            # 2. Converts to 68 DK regions
+            source_data = process_data(processor, data, n_jobs=n_jobs)
 
-                processor = SequentialProcessor(
-                    memory_manager=memory_manager,
-                    montage=montage,
-                    resample_freq=resample_freq or data.info['sfreq'],
-                    lambda2=lambda2
+            # Determine output directory
+            if "derivatives_dir" in config:
+                base_dir = Path(config["derivatives_dir"])
+            elif file_path is not None:
+                base_dir = Path(file_path).parent / "derivatives"
+            else:
+                base_dir = Path.cwd() / "derivatives"
+
+            output_dir = base_dir / "source_localization"
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+            # Determine subject ID
+            if "unprocessed_file" in config:
+                subject_id = _file_stem(config["unprocessed_file"])
+            elif "subject_id" in config:
+                subject_id = config["subject_id"]
+            elif "base_fname" in config:
+                subject_id = config["base_fname"]
+            elif "original_fname" in config:
+                subject_id = _file_stem(config["original_fname"])
+            elif file_path is not None:
+                subject_id = _file_stem(file_path)
+            else:
+                subject_id = "unknown"
+
+            # Save outputs once, directly to the derivatives directory
+            final_file = output_dir / f"{subject_id}_dk_regions.set"
+            region_info_dst = output_dir / f"{subject_id}_region_info.csv"
+
+            source_data.export(str(final_file), fmt='eeglab', overwrite=True)
+            save_region_info(source_data, region_info_dst)
+
+            # Store results in task object
+            self.source_eeg = source_data
+            self.source_eeg_file = str(final_file)
+
+            # Legacy attributes: make absence explicit for downstream callers
+            self.stc = None
+            self.stc_list = None
+            if message is _print_message:
+                warnings.warn(
+                    "Legacy STC outputs are no longer generated. "
+                    "Use source-localized ROI EEG data instead.",
+                    stacklevel=2,
+                )
+            else:
+                message(
+                    "warning",
+                    (
+                        "Legacy STC outputs are no longer generated. "
+                        "Use self.source_eeg (68 DK ROIs)."
+                    ),
                 )
 
-                if hasattr(self, "message"):
-                    self.message("info", "Processing with source localization...")
-
-                # Process file - this does everything:
-                # 1. Validates file
-                # 2. Applies source localization
-                # 3. Converts to 68 DK regions
-                # 4. Saves output
-                result = processor.process_file(tmp_input, tmpdir)
-
-                if result['status'] != 'success':
-                    raise RuntimeError(
-                        f"Source localization failed: {result.get('error', 'Unknown error')}"
-                    )
-
-                # Load the 68-region output
-                output_file = result['output_file']
-
-                if hasattr(self, "message"):
-                    self.message("info", "Loading 68-region output...")
+            message("success", "Source localization complete: 68 DK regions")
+            message("info", f"Saved to: {final_file}")
 
-                # Read back the source-localized data (68 channels)
+            # Update metadata
+            if update_metadata is not None:
+                sfreq = source_data.info['sfreq']
                 if is_raw:
-                    source_data = mne.io.read_raw_eeglab(output_file, preload=True)
+                    shape_metadata = {"duration_sec": source_data.times[-1]}
                 else:
-                    source_data = mne.read_epochs_eeglab(output_file)
+                    shape_metadata = {
+                        "n_epochs": len(source_data),
+                        "epoch_duration_sec": source_data.times[-1] - source_data.times[0],
+                    }
 
-                # Determine output directory
-                if hasattr(self, "config") and "derivatives_dir" in self.config:
-                    base_dir = Path(self.config["derivatives_dir"])
-                elif hasattr(self, "file_path"):
-                    base_dir = Path(self.file_path).parent / "derivatives"
-                else:
-                    base_dir = Path.cwd() / "derivatives"
-
-                output_dir = base_dir / "source_localization"
-                output_dir.mkdir(parents=True, exist_ok=True)
-
-                # Determine subject ID
-                subject_id = None
-                if hasattr(self, "config"):
-                    config = self.config
-                    if "unprocessed_file" in config:
-                        subject_id = Path(config["unprocessed_file"]).stem
-                    elif "subject_id" in config:
-                        subject_id = config["subject_id"]
-                    elif "base_fname" in config:
-                        subject_id = config["base_fname"]
-                    elif "original_fname" in config:
-                        subject_id = Path(config["original_fname"]).stem
-
-                if subject_id is None and hasattr(self, "file_path"):
-                    subject_id = Path(self.file_path).stem
-
-                if subject_id is None:
-                    subject_id = "unknown"
-
-                # Copy output files to derivatives directory
-                final_file = output_dir / f"{subject_id}_dk_regions.set"
-                final_fdt = output_dir / f"{subject_id}_dk_regions.fdt"
-                region_info_src = Path(tmpdir) / "temp_input_region_info.csv"
-                region_info_dst = output_dir / f"{subject_id}_region_info.csv"
-
-                # Copy .set file
-                shutil.copy2(output_file, final_file)
-
-                # Copy .fdt file if it exists
-                fdt_file = output_file.replace('.set', '.fdt')
-                if os.path.exists(fdt_file):
-                    shutil.copy2(fdt_file, final_fdt)
-
-                # Copy region info CSV
-                if region_info_src.exists():
-                    shutil.copy2(region_info_src, region_info_dst)
-
-                # Store results in task object
-                self.source_eeg = source_data
-                self.source_eeg_file = str(final_file)
-
-                # Legacy attributes: make absence explicit for downstream callers
-                self.stc = None
-                self.stc_list = None
-                if hasattr(self, "message"):
-                    self.message(
-                        "warning",
-                        (
-                            "Legacy STC outputs are no longer generated. "
-                            "Use self.source_eeg (68 DK ROIs)."
-                        ),
-                    )
-                else:
-                    warnings.warn(
-                        "Legacy STC outputs are no longer generated. "
-                        "Use source-localized ROI EEG data instead.",
-                        stacklevel=2,
-                    )
-
-                if hasattr(self, "message"):
-                    self.message(
-                        "success",
-                        f"Source localization complete: 68 DK regions"
-                    )
-                    self.message("info", f"Saved to: {final_file}")
-
-            # Update metadata
-            if hasattr(self, "_update_metadata"):
                 metadata = {
                     "method": method,
                     "lambda2": lambda2,
@@ -317,25 +261,90 @@ class SourceLocalizationMixin:
                     "output_file": str(final_file),
                     "region_info_file": str(region_info_dst),
                     "package": "autocleaneeg-eeg2source",
-                    "data_type": "raw" if is_raw else "epochs",
+                    "data_type": data_type,
+                    **shape_metadata,
+                    "sfreq": sfreq,
                 }
 
-                if is_raw:
-                    metadata["duration_sec"] = source_data.times[-1]
-                    metadata["sfreq"] = source_data.info['sfreq']
-                else:
-                    metadata["n_epochs"] = len(source_data)
-                    metadata["epoch_duration_sec"] = source_data.times[-1] - source_data.times[0]
-                    metadata["sfreq"] = source_data.info['sfreq']
-
-                self._update_metadata("step_apply_source_localization", metadata)
+                update_metadata("step_apply_source_localization", metadata)
 
             return source_data
 
         except Exception as e:
             error_msg = f"Error during source localization: {str(e)}"
-            if hasattr(self, "message"):
-                self.message("error", error_msg)
-            else:
-                print(f"ERROR: {error_msg}")
+            message("error", error_msg)
             raise RuntimeError(f"Failed to apply source localization: {str(e)}") from e
+
+    def prefetch_source_operators(
+        self,
+        data: Union[mne.io.Raw, mne.Epochs, None] = None,
+        montage: Optional[str] = None,
+        resample_freq: Optional[float] = None,
+        n_jobs: int = 1,
+    ):
+        """Start building the forward/inverse operators in a background thread.
+
+        Call early in a task (e.g. right after import) so the fsaverage forward
+        solution is computed while preprocessing runs. apply_source_localization
+        waits for the build and reuses the cached operators, provided the channel
+        names, bad channels and montage end up the same; resampling in between
+        does not matter.
+
+        Args:
+            data: Raw or Epochs whose channels will be localized. If None, uses
+                self.epochs or self.raw
+            montage: EEG montage name (default: None, auto-detect from data)
+            resample_freq: Target sampling frequency (default: keep original)
+            n_jobs: Worker processes for the forward solution build
+
+        Returns:
+            concurrent.futures.Future resolving to (forward, inverse), or None
+            when the installed eeg2source does not use the operator cache
+        """
+        from .algorithm import MemoryManager, SequentialProcessor, prefetch_operators
+
+        if data is None:
+            data = getattr(self, "epochs", None)
+            if data is None:
+                data = getattr(self, "raw", None)
+            if data is None:
+                raise AttributeError(
+                    "No input data found. Provide data parameter or ensure "
+                    "self.raw or self.epochs exists."
+                )
+
+        if montage is None:
+            montage_name = _detect_montage_name(data)
+            montage = (
+                montage_name
+                if montage_name not in (None, "unknown")
+                else "standard_1020"
+            )
+
+        processor = SequentialProcessor(
+            memory_manager=MemoryManager(),
+            montage=montage,
+            resample_freq=resample_freq or data.info['sfreq'],
+        )
+        return prefetch_operators(processor, data.info, n_jobs=n_jobs)
+
+
+def _detect_montage_name(data) -> Optional[str]:
+    """Return the montage kind set on ``data``, 'unknown' if unnamed, or None."""
+    detected_montage = data.get_montage()
+    if detected_montage is None:
+        return None
+    return getattr(detected_montage, 'kind', 'unknown')
+
+
+def _file_stem(path) -> str:
+    """Lexical ``Path(path).stem`` without constructing a Path object."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _print_message(level: str, text: str) -> None:
+    """Fallback logger used when the task object has no ``message`` method."""
+    if level == "header":
+        print(f"=== {text} ===")
+    else:
+        print(f"{level.upper()}: {text}")
@@ -16,15 +16,13 @@ Source-level PSD is fundamental for:
 - Group-level statistical analyses of regional power
 """
 
+import json
 from pathlib import Path
 from typing import Optional, Union
 
 import mne
 import pandas as pd
 
-# Import algorithm functions
-from .algorithm import calculate_roi_psd, calculate_source_psd_list, visualize_psd_results
-
 
 class SourcePSDMixin:
     """Mixin class providing functionality for source-level PSD calculation.
@@ -61,6 +59,9 @@ class SourcePSDMixin:
         n_jobs: int = 4,
         generate_plots: bool = True,
         stage_name: str = "apply_source_psd",
+        backend: str = "cpu",
+        reuse_existing: bool = False,
+        generate_secondary_visualization: bool = False,
     ) -> tuple:
         """Calculate power spectral density from source-localized data with ROI averaging.
 
@@ -84,17 +85,26 @@ class SourcePSDMixin:
         50% overlap). Results include:
         - Full frequency-resolved PSD (0.5-45 Hz) for each ROI
         - Band power summaries (delta, theta, alpha, beta, gamma)
-        - Diagnostic visualizations (4-panel plots)
+        - Diagnostic band plots, plus an optional 4-panel overview figure
 
         Args:
             stc_list: Optional SourceEstimate or list. If None, auto-detects from
                 self.source_eeg (ROI mode) or self.stc/self.stc_list (vertex mode)
             segment_duration: Duration in seconds to process (default: 80s for optimal
-                balance of accuracy and performance). If None, uses entire data.
-            n_jobs: Number of parallel jobs for computation (default: 4)
-                Note: Only used in vertex-level mode
-            generate_plots: Whether to generate diagnostic PSD plots (default: True)
+                balance of accuracy and performance). If None, uses entire data. A
+                single continuous SourceEstimate is cropped to its central samples
+            n_jobs: Number of worker threads for the FFTs inside Welch's method, in both
+                ROI and vertex-level mode (default: 4)
+            generate_plots: Whether the PSD functions save their diagnostic band plots
+                (default: True)
             stage_name: Name for saving and metadata tracking
+            backend: 'cpu' (default) or 'cupy' for GPU Welch in vertex-level mode;
+                falls back to CPU when cupy is not installed
+            reuse_existing: Load {subject}_roi_psd.parquet from a previous run instead
+                of recomputing when it is newer than self.file_path and was computed
+                with the same mode, segment_duration and backend (default: False)
+            generate_secondary_visualization: Also render the 4-panel overview figure
+                {subject}_psd_visualization.png (default: False)
 
         Returns:
             tuple: (psd_df, file_path) where:
@@ -129,7 +139,8 @@ class SourcePSDMixin:
         - Saves three files:
             * {subject}_roi_psd.parquet: Full frequency-resolved data
             * {subject}_roi_bands.csv: Band power summaries
-            * {subject}_psd_visualization.png: Diagnostic plots (if generate_plots=True)
+            * {subject}_psd_visualization.png: 4-panel overview
+              (if generate_secondary_visualization=True)
         - Frequency bands: delta (1-4), theta (4-8), alpha (8-13), beta (13-30), gamma (30-45)
         - Processes middle epochs/segments for better stationarity
         """
@@ -149,6 +160,11 @@ class SourcePSDMixin:
                 segment_duration = config_value.get("segment_duration", segment_duration)
                 n_jobs = config_value.get("n_jobs", n_jobs)
                 generate_plots = config_value.get("generate_plots", generate_plots)
+                backend = config_value.get("backend", backend)
+                reuse_existing = config_value.get("reuse_existing", reuse_existing)
+                generate_secondary_visualization = config_value.get(
+                    "generate_secondary_visualization", generate_secondary_visualization
+                )
 
         # Determine which data to use and which mode to run
         # Priority: explicit parameter > self.source_eeg (v2.0+) > self.stc/stc_list (v1.0)
@@ -253,81 +269,92 @@ class SourcePSDMixin:
                         print(f"Input: {len(stc_list)} SourceEstimates")
                     print("Mode: Vertex-level with parcellation")
 
-            # Prepare parameters
-            output_dir = None
-            subject_id = None  # Leave as None to let algorithm function handle default
-
-            # Get output directory and subject ID from task config
-            if hasattr(self, "config"):
-                config = self.config
-                # Use derivatives_dir if available (BIDS structure)
-                if "derivatives_dir" in config:
-                    output_dir = Path(config["derivatives_dir"]) / "psd"
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    output_dir = str(output_dir)
-                elif "output_dir" in config:
-                    output_dir = config["output_dir"]
-
-                # Get subject ID from config - use same method as export functions
-                if "unprocessed_file" in config:
-                    subject_id = Path(config["unprocessed_file"]).stem
-                elif "subject_id" in config:
-                    subject_id = config["subject_id"]
-                elif "base_fname" in config:
-                    subject_id = config["base_fname"]
-                elif "original_fname" in config:
-                    # Extract just the stem (no extension)
-                    subject_id = Path(config["original_fname"]).stem
-
-            # If output_dir not in config, try to construct from file paths
-            if output_dir is None and hasattr(self, "file_path"):
-                output_dir = Path(self.file_path).parent / "derivatives" / "source_psd"
-                output_dir.mkdir(parents=True, exist_ok=True)
-                output_dir = str(output_dir)
-
-            # If subject_id not in config, try to extract from filename
-            if subject_id is None and hasattr(self, "file_path"):
-                subject_id = Path(self.file_path).stem
-
-            # Call appropriate algorithm function based on mode
-            if use_roi_mode:
-                # ROI-optimized mode: Process 68 channels directly
-                psd_df, file_path = calculate_roi_psd(
-                    data=roi_data,
-                    segment_duration=segment_duration,
-                    n_jobs=n_jobs,  # Not currently used but kept for API consistency
-                    output_dir=output_dir,
-                    subject_id=subject_id,
-                    generate_plots=generate_plots,
-                )
-            else:
-                # Vertex-level mode: Process 20,484 vertices with parcellation
-                psd_df, file_path = calculate_source_psd_list(
-                    stc_list=stc_list,
-                    subjects_dir=None,  # Uses MNE environment variable
-                    subject="fsaverage",
-                    n_jobs=n_jobs,
-                    output_dir=output_dir,
-                    subject_id=subject_id,
-                    generate_plots=generate_plots,
-                    segment_duration=segment_duration,
-                )
+            # Resolve output directory and subject ID from the task config and
+            # file path; the algorithm functions create the directory
+            config = getattr(self, "config", None) or {}
+            output_dir, subject_id = _resolve_psd_paths(
+                config.get("derivatives_dir"),
+                config.get("output_dir"),
+                config.get("unprocessed_file"),
+                config.get("subject_id"),
+                config.get("base_fname"),
+                config.get("original_fname"),
+                getattr(self, "file_path", None),
+            )
 
-            # Generate additional visualization if requested
-            if generate_plots:
-                try:
-                    visualize_psd_results(
-                        psd_df=psd_df, output_dir=output_dir, subject_id=subject_id
-                    )
-                except Exception as e:
+            # Parameters the stored PSD values depend on, kept in a sidecar JSON
+            psd_params = {
+                "psd_mode": "roi_optimized" if use_roi_mode else "vertex_level",
+                "segment_duration": segment_duration,
+                "backend": backend,
+            }
+
+            # Reuse a previous run's PSD if it is newer than the source file and
+            # was computed with the same parameters
+            reused = False
+            if reuse_existing and output_dir is not None and subject_id is not None:
+                existing_file = Path(output_dir) / f"{subject_id}_roi_psd.parquet"
+                source_file = Path(getattr(self, "file_path", None) or "")
+                if _psd_is_reusable(existing_file, source_file, psd_params):
+                    psd_df = pd.read_parquet(existing_file)
+                    file_path = str(existing_file)
+                    reused = True
                     if hasattr(self, "message"):
-                        self.message("warning", f"Could not generate PSD visualization: {str(e)}")
+                        self.message("info", f"Reusing existing source PSD: {file_path}")
                     else:
-                        print(f"WARNING: Could not generate PSD visualization: {str(e)}")
+                        print(f"INFO: Reusing existing source PSD: {file_path}")
+
+            if not reused:
+                # Deferred so disabled or reused runs never import matplotlib/seaborn
+                from .algorithm import (
+                    calculate_roi_psd,
+                    calculate_source_psd_list,
+                    visualize_psd_results,
+                )
+
+                # Call appropriate algorithm function based on mode
+                if use_roi_mode:
+                    # ROI-optimized mode: Process 68 channels directly
+                    psd_df, file_path = calculate_roi_psd(
+                        data=roi_data,
+                        segment_duration=segment_duration,
+                        n_jobs=n_jobs,
+                        output_dir=output_dir,
+                        subject_id=subject_id,
+                        generate_plots=generate_plots,
+                    )
+                else:
+                    # Vertex-level mode: Process 20,484 vertices with parcellation
+                    psd_df, file_path = calculate_source_psd_list(
+                        stc_list=stc_list,
+                        subjects_dir=None,  # Uses MNE environment variable
+                        subject="fsaverage",
+                        n_jobs=n_jobs,
+                        output_dir=output_dir,
+                        subject_id=subject_id,
+                        generate_plots=generate_plots,
+                        segment_duration=segment_duration,
+                        backend=backend,
+                    )
 
-            # Log completion
-            n_rois = len(psd_df["roi"].unique())
-            n_freqs = len(psd_df["frequency"].unique())
+                # Generate the 4-panel overview figure if requested
+                if generate_secondary_visualization:
+                    try:
+                        visualize_psd_results(
+                            psd_df=psd_df, output_dir=output_dir, subject_id=subject_id
+                        )
+                    except Exception as e:
+                        if hasattr(self, "message"):
+                            self.message("warning", f"Could not generate PSD visualization: {str(e)}")
+                        else:
+                            print(f"WARNING: Could not generate PSD visualization: {str(e)}")
+
+                _psd_params_path(file_path).write_text(json.dumps(psd_params))
+
+            # Log completion; the distinct frequencies also give the range below
+            freqs = psd_df["frequency"].unique()
+            n_rois = psd_df["roi"].nunique()
+            n_freqs = len(freqs)
 
             if hasattr(self, "message"):
                 self.message(
@@ -346,13 +373,16 @@ class SourcePSDMixin:
                 metadata = {
                     "segment_duration": segment_duration,
                     "n_jobs": n_jobs,
+                    "backend": backend,
                     "generate_plots": generate_plots,
+                    "generate_secondary_visualization": generate_secondary_visualization,
                     "n_rois": n_rois,
                     "n_frequencies": n_freqs,
-                    "freq_min": float(psd_df["frequency"].min()),
-                    "freq_max": float(psd_df["frequency"].max()),
+                    "freq_min": float(freqs.min()),
+                    "freq_max": float(freqs.max()),
                     "output_file": file_path,
                     "psd_mode": "roi_optimized" if use_roi_mode else "vertex_level",
+                    "reused": reused,
                 }
 
                 if use_roi_mode:
@@ -381,4 +411,68 @@ class SourcePSDMixin:
                 self.message("error", error_msg)
             else:
                 print(f"ERROR: {error_msg}")
-            raise RuntimeError(f"Failed to calculate source PSD: {str(e)}") from e
\ No newline at end of file
+            raise RuntimeError(f"Failed to calculate source PSD: {str(e)}") from e
+
+
+def _psd_params_path(parquet_file) -> Path:
+    """Return the sidecar JSON path holding the parameters of a PSD parquet."""
+    parquet_file = Path(parquet_file)
+    return parquet_file.with_name(f"{parquet_file.stem}_params.json")
+
+
+def _psd_is_reusable(parquet_file, source_file, psd_params) -> bool:
+    """Check that a previous PSD parquet is newer than the source and matches ``psd_params``.
+
+    Parquets without a parameter sidecar (older runs) are never reused.
+    """
+    params_file = _psd_params_path(parquet_file)
+    if not (parquet_file.exists() and params_file.exists()):
+        return False
+    if source_file.is_file() and parquet_file.stat().st_mtime <= source_file.stat().st_mtime:
+        return False
+    try:
+        return json.loads(params_file.read_text()) == psd_params
+    except ValueError:
+        return False
+
+
+def _resolve_psd_paths(
+    derivatives_dir,
+    config_output_dir,
+    unprocessed_file,
+    config_subject_id,
+    base_fname,
+    original_fname,
+    file_path,
+) -> tuple:
+    """Return ``(output_dir, subject_id)`` for the PSD outputs; either may be None.
+
+    Output directory priority: ``derivatives_dir/psd`` (BIDS), config
+    ``output_dir``, then ``derivatives/source_psd`` next to ``file_path``. The
+    subject ID follows the export functions: ``unprocessed_file`` stem,
+    ``subject_id``, ``base_fname``, ``original_fname`` stem, then the
+    ``file_path`` stem. None leaves the default to the algorithm function.
+    """
+    if derivatives_dir is not None:
+        output_dir = str(Path(derivatives_dir) / "psd")
+    elif config_output_dir is not None:
+        output_dir = config_output_dir
+    elif file_path is not None:
+        output_dir = str(Path(file_path).parent / "derivatives" / "source_psd")
+    else:
+        output_dir = None
+
+    if unprocessed_file is not None:
+        subject_id = Path(unprocessed_file).stem
+    elif config_subject_id is not None:
+        subject_id = config_subject_id
+    elif base_fname is not None:
+        subject_id = base_fname
+    elif original_fname is not None:
+        subject_id = Path(original_fname).stem
+    elif file_path is not None:
+        subject_id = Path(file_path).stem
+    else:
+        subject_id = None
+
+    return output_dir, subject_id
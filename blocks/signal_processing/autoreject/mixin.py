@@ -15,14 +15,15 @@ reduces the need for manual inspection and rejection of artifacts, while maintai
 the quality of the data for subsequent analysis.
 """
 
+import hashlib
+import os
 from pathlib import Path
 from typing import List, Optional, Union
 
 import mne
+import numpy as np
 
-from autoclean.functions.advanced.autoreject_reporting import generate_autoreject_report
 from autoclean.utils.logging import message
-from autoreject import AutoReject
 
 
 class AutoRejectEpochsMixin:
@@ -48,7 +49,8 @@ class AutoRejectEpochsMixin:
         epochs: Union[mne.Epochs, None] = None,
         n_interpolate: Optional[List[int]] = None,
         consensus: Optional[List[float]] = None,
-        n_jobs: int = 1,
+        n_jobs: int = -1,
+        reuse_thresholds: bool = False,
         stage_name: str = "apply_autoreject",
     ) -> mne.Epochs:
         """Apply AutoReject to clean epochs by removing artifacts and interpolating bad channels.
@@ -70,7 +72,13 @@ class AutoRejectEpochsMixin:
             epochs: Optional MNE Epochs object. If None, uses self.epochs
             n_interpolate: List of number of channels to interpolate. If None, uses default values
             consensus: List of consensus percentages. If None, uses default values
-            n_jobs: Number of parallel jobs to run (default: 1)
+            n_jobs: Number of parallel jobs for the per-channel threshold search
+                (default: -1, all CPU cores). -1 or None resolves to os.cpu_count()
+            reuse_thresholds: Reuse a fitted AutoReject cached under
+                ~/.cache/autoclean/autoreject/ for recordings with the same channels,
+                bad channels, sampling rate, epoch length, parameter grid and
+                autoreject version, skipping the cross-validated fit (default: False). The first run fits and caches.
+                Thresholds are data-driven, so only enable this for homogeneous data
             stage_name: Name for saving and metadata tracking
 
         Returns:
@@ -107,6 +115,12 @@ class AutoRejectEpochsMixin:
             n_interpolate = config_value.get("n_interpolate", n_interpolate)
             consensus = config_value.get("consensus", consensus)
             n_jobs = config_value.get("n_jobs", n_jobs)
+            reuse_thresholds = config_value.get("reuse_thresholds", reuse_thresholds)
+
+        # AutoReject forwards n_jobs to joblib (loky processes); resolve -1 so
+        # the metadata records the worker count actually used
+        if n_jobs is None or n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
 
         # Determine which data to use
         if epochs is None:
@@ -118,30 +132,48 @@ class AutoRejectEpochsMixin:
         ):  # pylint: disable=isinstance-second-argument-not-valid-type
             raise TypeError("Data must be an MNE Epochs object for AutoReject")
 
+        # Deferred so disabled runs never import autoreject (scikit-learn, h5io)
+        from autoreject import AutoReject, read_auto_reject
+
         try:
             message("header", "Applying AutoReject for artifact rejection")
 
-            # Store copy of original epochs for reporting
-            epochs_before = epochs.copy()
+            # Load thresholds fitted on an earlier recording with the same layout
+            ar = None
+            cache_file = None
+            if reuse_thresholds:
+                cache_file = _threshold_cache_file(epochs, n_interpolate, consensus)
+                if cache_file.is_file():
+                    ar = read_auto_reject(str(cache_file))
+                    message("info", f"Reusing AutoReject thresholds from {cache_file}")
+            reused_thresholds = ar is not None
+
+            if ar is None:
+                # Create AutoReject object with parameters if provided
+                if n_interpolate is not None and consensus is not None:
+                    ar = AutoReject(
+                        n_interpolate=n_interpolate, consensus=consensus, n_jobs=n_jobs
+                    )
+                else:
+                    ar = AutoReject(n_jobs=n_jobs)
+                ar.fit(epochs)
 
-            # Create AutoReject object with parameters if provided
-            if n_interpolate is not None and consensus is not None:
-                ar = AutoReject(
-                    n_interpolate=n_interpolate, consensus=consensus, n_jobs=n_jobs
-                )
-            else:
-                ar = AutoReject(n_jobs=n_jobs)
+                if cache_file is not None:
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    ar.save(str(cache_file), overwrite=True)
 
-            # Fit and transform epochs
-            epochs_clean, rejection_log = ar.fit_transform(epochs, return_log=True)
+            # Transform epochs with the fitted (or cached) thresholds
+            epochs_clean, rejection_log = ar.transform(epochs, return_log=True)
 
             # Calculate statistics
-            rejected_epochs = len(epochs) - len(epochs_clean)
+            n_initial = len(epochs)
+            n_final = len(epochs_clean)
+            rejected_epochs = n_initial - n_final
             rejection_percent = (
-                round((rejected_epochs / len(epochs)) * 100, 2)
-                if len(epochs) > 0
-                else 0
+                round((rejected_epochs / n_initial) * 100, 2) if n_initial > 0 else 0
             )
+            epoch_duration = epochs.times[-1] - epochs.times[0]
+            samples_per_epoch = epochs.times.shape[0]
 
             message(
                 "info",
@@ -151,19 +183,19 @@ class AutoRejectEpochsMixin:
 
             # Update metadata
             metadata = {
-                "initial_epochs": len(epochs),
-                "final_epochs": len(epochs_clean),
+                "initial_epochs": n_initial,
+                "final_epochs": n_final,
                 "rejected_epochs": rejected_epochs,
                 "rejection_percent": rejection_percent,
-                "epoch_duration": epochs.times[-1] - epochs.times[0],
-                "samples_per_epoch": epochs.times.shape[0],
-                "total_duration_sec": (epochs.times[-1] - epochs.times[0])
-                * len(epochs_clean),
-                "total_samples": epochs.times.shape[0] * len(epochs_clean),
+                "epoch_duration": epoch_duration,
+                "samples_per_epoch": samples_per_epoch,
+                "total_duration_sec": epoch_duration * n_final,
+                "total_samples": samples_per_epoch * n_final,
                 "channel_count": len(epochs.ch_names),
                 "n_interpolate": n_interpolate,
                 "consensus": consensus,
                 "n_jobs": n_jobs,
+                "reused_thresholds": reused_thresholds,
             }
 
             self._update_metadata("step_apply_autoreject", metadata)
@@ -192,17 +224,30 @@ class AutoRejectEpochsMixin:
                     report_path = derivatives_dir / filename
 
                 if report_path:
+                    from autoclean.functions.advanced.autoreject_reporting import (
+                        generate_autoreject_report,
+                    )
+
                     # Generate report with rejection log
                     ar_params = {
                         "n_interpolate": n_interpolate,
                         "consensus": consensus,
                         "n_jobs": n_jobs,
                     }
+                    # Labels are small codes (0, 1, 2) per epoch and channel; int8
+                    # is 8x smaller than float64. NaN marks channels outside the
+                    # picks, so those logs stay float to keep the heatmap gaps
+                    labels = getattr(rejection_log, "labels", None)
+                    if labels is not None and not np.isnan(labels).any():
+                        labels = labels.astype(np.int8)
+
+                    # AutoReject cleans a copy, so the input epochs are still the
+                    # "before" data and need no defensive copy of their own
                     report_result = generate_autoreject_report(
-                        epochs_before=epochs_before,
+                        epochs_before=epochs,
                         epochs_after=epochs_clean,
                         output_pdf=report_path,
-                        rejection_log=rejection_log.labels if hasattr(rejection_log, "labels") else None,
+                        rejection_log=labels,
                         ar_params=ar_params,
                     )
 
@@ -229,3 +274,33 @@ class AutoRejectEpochsMixin:
         except Exception as e:
             message("error", f"Error during AutoReject: {str(e)}")
             raise RuntimeError(f"Failed to apply AutoReject: {str(e)}") from e
+
+
+def _threshold_cache_file(
+    epochs: mne.Epochs,
+    n_interpolate: Optional[List[int]],
+    consensus: Optional[List[float]],
+) -> Path:
+    """Path of the cached AutoReject fit for this channel layout and parameter grid.
+
+    A fit stores picks_ as channel indices without the bad channels, so bads are
+    part of the key, as is the autoreject version that wrote the HDF5 file.
+    """
+    import autoreject
+
+    # Mirrors apply_autoreject: a custom grid is only used when both lists are set
+    grid = None
+    if n_interpolate is not None and consensus is not None:
+        grid = (tuple(n_interpolate), tuple(consensus))
+    key = repr(
+        (
+            tuple(epochs.ch_names),
+            tuple(epochs.info["bads"]),
+            float(epochs.info["sfreq"]),
+            len(epochs.times),
+            grid,
+            autoreject.__version__,
+        )
+    )
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return Path.home() / ".cache" / "autoclean" / "autoreject" / f"ar_{digest}.h5"
@@ -6,10 +6,19 @@ method, showing epoch quality, rejection statistics, and interpolation patterns.
 
 from __future__ import annotations
 
+import os
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
+import matplotlib
+
+# Reports are written to PDF only; use the non-interactive Agg backend unless
+# the caller already chose one (MPLBACKEND, e.g. in Jupyter) or imported pyplot
+if "matplotlib.pyplot" not in sys.modules and "MPLBACKEND" not in os.environ:
+    matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
 import mne
 import numpy as np
@@ -66,21 +75,22 @@ def generate_autoreject_report(
 
     # Identify interpolated channels
     interpolated_channels = []
+    n_interp_per_channel = None
     if rejection_log is not None:
-        # Count interpolations per channel across all epochs
+        # Count interpolations per channel across all epochs (reused for page 3)
         n_interp_per_channel = np.sum(rejection_log == 1, axis=0)
         ch_names = epochs_before.ch_names
         interpolated_channels = [
-            ch_names[i] for i in range(len(ch_names)) if n_interp_per_channel[i] > 0
+            ch_names[i] for i in np.flatnonzero(n_interp_per_channel).tolist()
         ]
 
-    # Calculate PSDs (using welch method which supports fmax parameter)
-    psd_before, freqs_before = epochs_before.compute_psd(method="welch", fmax=50.0).get_data(return_freqs=True)
-    psd_after, freqs_after = epochs_after.compute_psd(method="welch", fmax=50.0).get_data(return_freqs=True)
-
-    # Average across epochs
-    psd_before_mean = psd_before.mean(axis=0)  # (n_channels, n_freqs)
-    psd_after_mean = psd_after.mean(axis=0)
+    # Epoch-averaged PSDs (using welch method which supports fmax parameter);
+    # only the (n_channels, n_freqs) averages are kept past this point
+    spectrum_before = epochs_before.compute_psd(method="welch", fmax=50.0).average()
+    spectrum_after = epochs_after.compute_psd(method="welch", fmax=50.0).average()
+    psd_before_mean = spectrum_before.get_data()  # (n_channels, n_freqs)
+    psd_after_mean = spectrum_after.get_data()
+    freqs_before = spectrum_before.freqs
 
     # Build summary
     summary = {
@@ -112,7 +122,7 @@ def generate_autoreject_report(
 
         # Page 3: Channel interpolation heatmap
         if rejection_log is not None:
-            fig3 = _create_interpolation_heatmap(rejection_log, epochs_before.ch_names)
+            fig3 = _create_interpolation_heatmap(n_interp_per_channel, epochs_before.ch_names)
             pdf.savefig(fig3, bbox_inches="tight")
             plt.close(fig3)
 
@@ -286,8 +296,19 @@ def _create_rejection_visualization(rejection_log: np.ndarray, ch_names: List[st
 
     epochs = np.arange(rejection_log.shape[0])
 
-    ax_summary.bar(epochs, n_interpolated, label="Interpolated Channels", color="#ffd43b", alpha=0.7)
-    ax_summary.bar(epochs, n_rejected, bottom=n_interpolated, label="Rejected", color="#ff6b6b", alpha=0.7)
+    if len(epochs) > 500:
+        # One stepped area per series instead of a Rectangle artist per epoch
+        ax_summary.fill_between(
+            epochs, 0, n_interpolated, step="mid",
+            label="Interpolated Channels", color="#ffd43b", alpha=0.7,
+        )
+        ax_summary.fill_between(
+            epochs, n_interpolated, n_interpolated + n_rejected, step="mid",
+            label="Rejected", color="#ff6b6b", alpha=0.7,
+        )
+    else:
+        ax_summary.bar(epochs, n_interpolated, label="Interpolated Channels", color="#ffd43b", alpha=0.7)
+        ax_summary.bar(epochs, n_rejected, bottom=n_interpolated, label="Rejected", color="#ff6b6b", alpha=0.7)
 
     ax_summary.set_xlabel("Epoch Number", fontsize=11)
     ax_summary.set_ylabel("Number of Bad Channels", fontsize=11)
@@ -298,15 +319,16 @@ def _create_rejection_visualization(rejection_log: np.ndarray, ch_names: List[st
     return fig
 
 
-def _create_interpolation_heatmap(rejection_log: np.ndarray, ch_names: List[str]) -> plt.Figure:
-    """Create heatmap showing interpolation frequency per channel."""
+def _create_interpolation_heatmap(n_interp_per_channel: np.ndarray, ch_names: List[str]) -> plt.Figure:
+    """Create heatmap showing interpolation frequency per channel.
+
+    ``n_interp_per_channel`` holds the number of epochs in which each channel
+    was interpolated, in the order of ``ch_names``.
+    """
     fig = plt.figure(figsize=(11, 14))
 
     fig.suptitle("Channel Interpolation Summary", fontsize=16, fontweight="bold", y=0.98)
 
-    # Count interpolations per channel
-    n_interp_per_channel = np.sum(rejection_log == 1, axis=0)
-
     # Sort channels by interpolation frequency
     sorted_indices = np.argsort(n_interp_per_channel)[::-1]
     sorted_channels = [ch_names[i] for i in sorted_indices]
@@ -315,14 +337,16 @@ def _create_interpolation_heatmap(rejection_log: np.ndarray, ch_names: List[str]
     # Plot top 30 channels
     n_show = min(30, len(ch_names))
 
-    ax = fig.add_subplot(111)
-    bars = ax.barh(range(n_show), sorted_counts[:n_show], color="#4dabf7")
-
-    # Color bars by frequency
+    # Color bars by frequency, mapped through the colormap in one call
     max_count = sorted_counts[0] if len(sorted_counts) > 0 else 1
-    for i, bar in enumerate(bars):
-        intensity = sorted_counts[i] / max_count if max_count > 0 else 0
-        bar.set_color(plt.cm.RdYlGn_r(intensity))
+    if max_count > 0:
+        intensities = sorted_counts[:n_show] / max_count
+    else:
+        intensities = np.zeros(n_show)
+    colors = plt.cm.RdYlGn_r(intensities)
+
+    ax = fig.add_subplot(111)
+    bars = ax.barh(range(n_show), sorted_counts[:n_show], color=colors, edgecolor=colors)
 
     ax.set_yticks(range(n_show))
     ax.set_yticklabels(sorted_channels[:n_show], fontsize=9)
@@ -0,0 +1,89 @@
+"""Shared fixtures for the block regression tests.
+
+Blocks are not an installed package, so their modules are loaded straight from
+file. The synthetic two-hemisphere source space and labels stand in for the
+fsaverage template, so tests using them run offline.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+BLOCKS_DIR = Path(__file__).resolve().parents[1] / "blocks"
+
+# Centre (head coordinates) of the sphere head model around the synthetic sources
+SPHERE_R0 = (0.0, 0.0, 0.04)
+
+
+@pytest.fixture(scope="session")
+def load_block():
+    """Return a loader for block modules, e.g. ``load("analysis/source_psd/algorithm.py", name)``."""
+
+    def load(relative_path, name):
+        spec = importlib.util.spec_from_file_location(name, BLOCKS_DIR / relative_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
+
+
+@pytest.fixture(scope="session")
+def synthetic_src():
+    """Two-hemisphere surface source space on a 6 cm shell inside ``sphere_bem``.
+
+    Vertices are placed in head coordinates and stored in fsaverage MRI
+    coordinates, so ``make_forward_solution(trans="fsaverage")`` maps them back.
+    """
+    mne = pytest.importorskip("mne")
+    from mne.io.constants import FIFF
+
+    head_to_mri = mne.read_trans(
+        Path(mne.__file__).parent / "data" / "fsaverage" / "fsaverage-trans.fif"
+    )
+    rng = np.random.default_rng(0)
+    n_vertices = 200
+    spaces = []
+    for hemi_id, side in (
+        (FIFF.FIFFV_MNE_SURF_LEFT_HEMI, -1),
+        (FIFF.FIFFV_MNE_SURF_RIGHT_HEMI, 1),
+    ):
+        nn = rng.standard_normal((n_vertices, 3))
+        nn /= np.linalg.norm(nn, axis=1, keepdims=True)
+        nn[:, 0] = side * np.abs(nn[:, 0])
+        nn[:, 2] = np.abs(nn[:, 2])
+        rr = mne.transforms.apply_trans(head_to_mri, np.add(SPHERE_R0, 0.06 * nn))
+        spaces.append(dict(
+            id=hemi_id, type="surf", np=n_vertices, ntri=0,
+            coord_frame=FIFF.FIFFV_COORD_MRI, rr=rr, nn=nn, tris=None,
+            nuse=n_vertices, inuse=np.ones(n_vertices, int),
+            vertno=np.arange(n_vertices), nuse_tri=0, use_tris=None,
+            nearest=None, nearest_dist=None, pinfo=None, patch_inds=None,
+            dist=None, dist_limit=None, subject_his_id="fsaverage",
+        ))
+    return mne.SourceSpaces(spaces)
+
+
+@pytest.fixture(scope="session")
+def synthetic_labels(synthetic_src):
+    """Four labels per hemisphere, splitting its vertices front to back."""
+    mne = pytest.importorskip("mne")
+    labels = []
+    for hemi, space in zip(("lh", "rh"), synthetic_src):
+        order = np.argsort(space["rr"][:, 1])
+        for k, vertices in enumerate(np.array_split(order, 4)):
+            vertices = np.sort(vertices)
+            labels.append(mne.Label(
+                vertices, pos=space["rr"][vertices], hemi=hemi,
+                name=f"region{k}-{hemi}", subject="fsaverage",
+            ))
+    return labels
+
+
+@pytest.fixture(scope="session")
+def sphere_bem():
+    """Four-layer sphere head model enclosing ``synthetic_src``."""
+    mne = pytest.importorskip("mne")
+    return mne.make_sphere_model(r0=SPHERE_R0, head_radius=0.09, verbose=False)
@@ -0,0 +1,180 @@
+"""Regression tests for the in-memory source localization path.
+
+``source_localization.algorithm.process_data`` mirrors the internals of
+``SequentialProcessor.process_file`` from autocleaneeg-eeg2source. The fsaverage
+tests run both on the same synthetic recording, with and without a bad channel,
+and require identical DK region output; they are skipped when the template
+cannot be fetched. The same comparison on the synthetic source space from
+``conftest.py``, and the operator cache tests, run offline.
+
+Run with ``python -m pytest tests``. Skipped when autocleaneeg-eeg2source is not
+installed.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+mne = pytest.importorskip("mne")
+pytest.importorskip("autoclean_eeg2source")
+
+ALGORITHM = "analysis/source_localization/algorithm.py"
+
+CH_NAMES = [
+    "Fp1", "Fp2", "F7", "F3", "Fz", "F4", "F8", "T7", "C3", "Cz",
+    "C4", "T8", "P7", "P3", "Pz", "P4", "P8", "O1", "Oz", "O2",
+]
+SFREQ = 100.0
+
+
+@pytest.fixture(scope="module")
+def algorithm(load_block):
+    pytest.importorskip("eeglabio")
+    module = load_block(ALGORITHM, "source_localization_algorithm")
+    if not module._MIRRORS_EEG2SOURCE:
+        pytest.skip("installed autocleaneeg-eeg2source is not the mirrored 0.3.x series")
+    try:
+        module._fs_dir()
+    except Exception as exc:  # offline, no cached fsaverage
+        # CI sets REQUIRE_FSAVERAGE so a failed download fails the run
+        if os.environ.get("REQUIRE_FSAVERAGE"):
+            raise
+        pytest.skip(f"fsaverage template unavailable: {exc}")
+    return module
+
+
+@pytest.fixture
+def synthetic_algorithm(load_block, synthetic_src, synthetic_labels, sphere_bem):
+    """Fresh module (empty caches) using the synthetic source space as fsaverage."""
+    module = load_block(ALGORITHM, "source_localization_synthetic")
+    if not module._MIRRORS_EEG2SOURCE:
+        pytest.skip("installed autocleaneeg-eeg2source is not the mirrored 0.3.x series")
+    module._FSAVERAGE = (synthetic_src, sphere_bem, synthetic_labels)
+    return module
+
+
+def _processor(algorithm):
+    return algorithm.SequentialProcessor(
+        memory_manager=algorithm.MemoryManager(),
+        montage="standard_1020",
+        resample_freq=SFREQ,
+    )
+
+
+def _info():
+    info = mne.create_info(CH_NAMES + ["HEOG"], SFREQ, ch_types="eeg")
+    info.set_montage("standard_1020", on_missing="ignore")
+    return info
+
+
+def _raw(bads=()):
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((len(CH_NAMES) + 1, int(10 * SFREQ))) * 1e-5
+    raw = mne.io.RawArray(data, _info(), verbose=False)
+    raw.info["bads"] = list(bads)
+    return raw
+
+
+def _epochs(bads=()):
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((5, len(CH_NAMES) + 1, int(2 * SFREQ))) * 1e-5
+    epochs = mne.EpochsArray(data, _info(), verbose=False)
+    epochs.info["bads"] = list(bads)
+    return epochs
+
+
+# (make_data, bads): a bad channel must stay out of both paths, although the
+# EEGLAB files read by process_file do not store info["bads"]
+DATA_CASES = pytest.mark.parametrize(
+    "make_data, bads",
+    [(_raw, ()), (_epochs, ()), (_raw, ("Cz",)), (_epochs, ("O1",))],
+    ids=["raw", "epochs", "raw-bad", "epochs-bad"],
+)
+
+
+def _assert_same_regions(actual, expected):
+    assert actual.ch_names == expected.ch_names
+    assert actual.info["sfreq"] == expected.info["sfreq"]
+    a = actual.get_data()
+    b = expected.get_data()
+    assert a.shape == b.shape
+    # The EEGLAB round trip stores float32
+    np.testing.assert_allclose(a, b, rtol=1e-4, atol=1e-4 * np.abs(b).max())
+
+
+@DATA_CASES
+def test_process_data_matches_process_file(algorithm, make_data, bads):
+    data = make_data(bads)
+
+    in_memory = algorithm.process_data(_processor(algorithm), data)
+    via_file = algorithm._process_via_eeglab(_processor(algorithm), data)
+
+    _assert_same_regions(in_memory, via_file)
+    assert len(in_memory.ch_names) == 68
+    assert data.info["bads"] == list(bads)
+
+
+@DATA_CASES
+def test_process_data_matches_process_file_offline(
+    synthetic_algorithm, synthetic_src, synthetic_labels, sphere_bem, make_data, bads
+):
+    pytest.importorskip("eeglabio")
+    alg = synthetic_algorithm
+    data = make_data(bads)
+
+    # process_file() skips its own fsaverage setup when these are already set
+    file_processor = _processor(alg)
+    file_processor.fsaverage_src = synthetic_src
+    file_processor.fsaverage_bem = sphere_bem
+    file_processor.labels = synthetic_labels
+
+    in_memory = alg.process_data(_processor(alg), data)
+    via_file = alg._process_via_eeglab(file_processor, data)
+
+    _assert_same_regions(in_memory, via_file)
+    assert in_memory.ch_names == [label.name for label in synthetic_labels]
+
+
+def test_operator_cache_separates_bad_channels(synthetic_algorithm):
+    alg = synthetic_algorithm
+    clean, with_bad = _raw(), _raw(bads=["Cz"])
+
+    assert alg._operator_key(_processor(alg), clean.info) != alg._operator_key(
+        _processor(alg), with_bad.info
+    )
+
+    # Same channel names, different bads: the second call must not reuse the
+    # first subject's operators
+    alg.process_data(_processor(alg), clean)
+    after_clean = alg.process_data(_processor(alg), with_bad)
+    assert len(alg._OPERATOR_CACHE) == 2
+
+    alg._OPERATOR_CACHE.clear()
+    alg._ROI_OPERATOR_CACHE.clear()
+    fresh = alg.process_data(_processor(alg), with_bad)
+    np.testing.assert_allclose(after_clean.get_data(), fresh.get_data())
+
+
+def test_prefetch_is_reused_after_resampling(synthetic_algorithm):
+    alg = synthetic_algorithm
+    original = _raw()
+    original.resample(200.0)
+    prefetch_processor = alg.SequentialProcessor(
+        memory_manager=alg.MemoryManager(), montage="standard_1020", resample_freq=200.0
+    )
+    alg.prefetch_operators(prefetch_processor, original.info).result()
+
+    alg.process_data(_processor(alg), _raw())
+    assert len(alg._OPERATOR_CACHE) == 1
+
+
+def test_prefetch_skipped_when_cache_unused(synthetic_algorithm):
+    alg = synthetic_algorithm
+
+    class NativeProcessor:
+        def process_data(self, data):
+            return data
+
+    assert alg.prefetch_operators(NativeProcessor(), _info()) is None
+    assert alg._OPERATOR_POOL is None
@@ -0,0 +1,114 @@
+"""Regression tests for the vertex-mode PSD helpers in ``source_psd.algorithm``.
+
+``_welch_bins``, ``_band_power_matrix`` and ``_label_membership_matrix`` replace
+``scipy.signal.welch``, masked band means and per-label averaging; these tests
+check them against those references. They run offline on synthetic data and the
+synthetic source space from ``conftest.py``.
+"""
+
+import numpy as np
+import pytest
+
+mne = pytest.importorskip("mne")
+pytest.importorskip("matplotlib")
+pytest.importorskip("seaborn")
+pytest.importorskip("pyarrow")
+from scipy import fft, signal  # noqa: E402
+
+SFREQ = 250.0
+
+
+@pytest.fixture(scope="module")
+def algorithm(load_block):
+    return load_block("analysis/source_psd/algorithm.py", "source_psd_algorithm")
+
+
+@pytest.mark.parametrize("dtype, rtol", [(np.float64, 1e-10), (np.float32, 1e-5)])
+@pytest.mark.parametrize("window_length", [500, 375, 499])
+def test_welch_bins_matches_scipy_welch(algorithm, dtype, rtol, window_length):
+    rng = np.random.default_rng(0)
+    data = (rng.standard_normal((6, int(20 * SFREQ))) * 1e-5 + 3e-6).astype(dtype)
+    n_overlap = window_length // 2
+
+    _, expected = signal.welch(
+        data, fs=SFREQ, window="hann", nperseg=window_length, noverlap=n_overlap,
+        detrend="constant", scaling="density", axis=-1,
+    )
+    # All bins (DC and, for even windows, Nyquist) and an interior range
+    for bins in (slice(0, window_length // 2 + 1), slice(1, 91)):
+        psd = algorithm._welch_bins(data, SFREQ, window_length, n_overlap, bins)
+        np.testing.assert_allclose(psd, expected[:, bins], rtol=rtol, atol=0)
+
+
+def test_band_power_matrix_matches_half_open_masks(algorithm):
+    rng = np.random.default_rng(1)
+    freqs = np.fft.rfftfreq(500, 1 / SFREQ)[1:91]
+    psd = rng.random((5, len(freqs)))
+    bands = {
+        "delta": (1, 4),
+        "theta": (4, 8),
+        "alpha": (8, 13),
+        "lowalpha": (8, 10),
+        "highalpha": (10, 13),
+        "lowbeta": (13, 20),
+        "highbeta": (20, 30),
+        "gamma": (30, 45),
+        "empty": (100, 120),
+    }
+
+    result = algorithm._band_power_matrix(psd, freqs, bands)
+
+    for i, (band_min, band_max) in enumerate(bands.values()):
+        mask = (freqs >= band_min) & (freqs < band_max)
+        expected = psd[:, mask].mean(axis=1) if mask.any() else np.zeros(len(psd))
+        np.testing.assert_allclose(result[:, i], expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "target, max_length", [(499, 1000), (1000, 1000), (997, 1000), (1009, 1009), (331, 340)]
+)
+def test_fast_window_length_is_fast_and_close(algorithm, target, max_length):
+    length = algorithm._fast_window_length(target, max_length)
+
+    assert length <= max_length
+    assert fft.next_fast_len(length, real=True) == length
+    assert length >= fft.prev_fast_len(target, real=True)
+    if length > target:
+        assert length <= target * 1.05
+
+
+def test_label_membership_matrix_matches_label_means(algorithm, synthetic_src, synthetic_labels):
+    vertices = [space["vertno"] for space in synthetic_src]
+    rng = np.random.default_rng(2)
+    data = rng.standard_normal((sum(len(v) for v in vertices), 30))
+    stc = mne.SourceEstimate(data, vertices, tmin=0, tstep=1 / SFREQ, subject="fsaverage")
+
+    matrix, kept = algorithm._label_membership_matrix(synthetic_labels, vertices)
+
+    expected = mne.extract_label_time_course(
+        stc, synthetic_labels, synthetic_src, mode="mean", verbose=False
+    )
+    assert [label.name for label in kept] == [label.name for label in synthetic_labels]
+    np.testing.assert_allclose(matrix @ data, expected, rtol=1e-12)
+
+
+def test_label_membership_matrix_skips_vertices_outside_source_space(
+    algorithm, synthetic_labels
+):
+    # Source space holding only the even vertices of each hemisphere and none
+    # of the first left-hemisphere label
+    first = synthetic_labels[0]
+    lh = np.setdiff1d(np.arange(0, 200, 2), first.vertices)
+    vertices = [lh, np.arange(0, 200, 2)]
+    offsets = {"lh": 0, "rh": len(lh)}
+
+    matrix, kept = algorithm._label_membership_matrix(synthetic_labels, vertices)
+
+    assert [label.name for label in kept] == [label.name for label in synthetic_labels[1:]]
+    dense = matrix.toarray()
+    for row, label in zip(dense, kept):
+        hemi_vertices = vertices[0] if label.hemi == "lh" else vertices[1]
+        used = np.flatnonzero(np.isin(hemi_vertices, label.vertices)) + offsets[label.hemi]
+        expected = np.zeros(dense.shape[1])
+        expected[used] = 1.0 / len(used)
+        np.testing.assert_allclose(row, expected)